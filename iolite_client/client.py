@@ -309,8 +309,19 @@ class Client:
         request = self.request_handler.get_action_request(device, property, value)
         await asyncio.create_task(self._fetch_application([request]))
 
+    async def async_set_properties(self, devices: List, property: str, value: float):
+        requests = [
+            self.request_handler.get_action_request(device, property, value)
+            for device in devices
+        ]
+        await asyncio.create_task(self._fetch_application(requests))
+
     def set_temp(self, device, value: float):
         asyncio.run(self.async_set_property(device, "heatingTemperatureSetting", value))
 
     def set_blind_level(self, device, value: float):
         asyncio.run(self.async_set_property(device, "blindLevel", value))
+
+    def set_blind_levels(self, devices: List, value: float):
+        """Sets the level of several blinds over a single connection."""
+        asyncio.run(self.async_set_properties(devices, "blindLevel", value))
@@ -1,19 +1,22 @@
-import os, json, logging, unicodedata
-from typing import Dict, List, Optional
+from __future__ import annotations
+
+import os, json, logging, time, unicodedata
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, cast
 
-import boto3
 from environs import Env
 
 from ask_sdk_core.skill_builder import SkillBuilder
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
 from ask_sdk_core.handler_input import HandlerInput
-from ask_sdk_core.utils import is_request_type, is_intent_name
+from ask_sdk_core.utils import get_intent_name, is_request_type, is_intent_name
 from ask_sdk_model import Response
 from ask_sdk_model.ui import SimpleCard
 
-from iolite_client.client import Client
-from iolite_client.entity import Blind
-from iolite_client.oauth_handler import OAuthHandler, OAuthWrapper, OAuthStorageInterface
+# iolite_client (websockets, aiohttp, requests) y boto3 se importan al primer uso:
+# Launch/Help/Cancel no los necesitan y así el cold start es más corto.
+if TYPE_CHECKING:
+    from iolite_client.client import Client
 
 # ================== LOG ==================
 logger = logging.getLogger(__name__)
@@ -30,42 +33,72 @@ NAME = env("NAME", "AlexaSkill")
 CODE = os.environ.get("CODE", "")         # Sólo para bootstrap si NO hay token en SSM
 BRIEF_MODE = env.bool("BRIEF_MODE", False)
 SSM_PARAM = os.environ.get("IOLITE_TOKEN_PARAM", "/iolite/access_token")
+TOKEN_CACHE_TTL = 60                      # segundos; muy por debajo de la vida del token
 
 # ================== SSM storage ==================
-_ssm = boto3.client("ssm")
+@lru_cache(maxsize=None)
+def _ssm():
+    # Perezoso: importar el módulo (p.ej. en tests) no toca AWS
+    import boto3
+    return boto3.client("ssm")
 
 def _ssm_fetch_json(name: str) -> Optional[dict]:
+    ssm = _ssm()
     try:
-        r = _ssm.get_parameter(Name=name, WithDecryption=True)
+        r = ssm.get_parameter(Name=name, WithDecryption=True)
         return json.loads(r["Parameter"]["Value"])
-    except _ssm.exceptions.ParameterNotFound:
+    except ssm.exceptions.ParameterNotFound:
         return None
     except Exception as e:
         logger.warning(f"SSM get_parameter error: {e}")
         return None
 
 def _ssm_store_json(name: str, value: dict):
-    _ssm.put_parameter(
+    _ssm().put_parameter(
         Name=name,
         Value=json.dumps(value),
         Type="SecureString",
         Overwrite=True
     )
 
-class SSMOAuthStorage(OAuthStorageInterface):
-    """Implementación de storage para OAuthWrapper usando SSM Parameter Store."""
+# Token en memoria por parámetro: (fetched_at, payload). Vale mientras el contenedor siga caliente.
+# Si otro contenedor rota el refresh_token, este lo ve a lo más TOKEN_CACHE_TTL segundos después.
+_token_cache: Dict[str, Tuple[float, dict]] = {}
+
+class SSMOAuthStorage:
+    """
+    Implementación de storage para OAuthWrapper usando SSM Parameter Store.
+    Implementa OAuthStorageInterface sin heredarla para no importar oauth_handler
+    al cargar el módulo; get_sid la trata como tal con cast.
+    """
     def __init__(self, param_name: str):
         self.param_name = param_name
 
     def store_access_token(self, payload: dict):
         _ssm_store_json(self.param_name, payload)
+        _token_cache[self.param_name] = (time.time(), dict(payload))
 
     def fetch_access_token(self) -> Optional[dict]:
-        return _ssm_fetch_json(self.param_name)
+        cached = _token_cache.get(self.param_name)
+        if cached and time.time() - cached[0] < TOKEN_CACHE_TTL:
+            return dict(cached[1])
+        payload = _ssm_fetch_json(self.param_name)
+        if payload is not None:
+            _token_cache[self.param_name] = (time.time(), dict(payload))
+        return payload
 
 # ================== SID / Client helpers ==================
 _client: Optional[Client] = None
 _discovery_done = False
+# IDs de persianas por nombre de cuarto, armado una vez tras el discovery;
+# se invalidan al reconstruir el cliente
+_blind_ids_by_room: Dict[str, List[str]] = {}
+_all_blind_ids_cache: Optional[List[str]] = None
+
+def _invalidate_blind_caches():
+    global _all_blind_ids_cache
+    _blind_ids_by_room.clear()
+    _all_blind_ids_cache = None
 
 def get_sid() -> str:
     """
@@ -74,7 +107,10 @@ def get_sid() -> str:
     - Si NO hay token y sí hay CODE: canjea una sola vez y guarda en SSM.
     - Si NO hay token y NO hay CODE: error claro.
     """
-    storage = SSMOAuthStorage(SSM_PARAM)
+    from iolite_client.oauth_handler import OAuthHandler, OAuthStorageInterface, OAuthWrapper
+
+    # SSMOAuthStorage implementa la interfaz sin heredarla (ver su docstring)
+    storage = cast(OAuthStorageInterface, SSMOAuthStorage(SSM_PARAM))
     token = storage.fetch_access_token()
 
     oauth_handler = OAuthHandler(USERNAME, PASSWORD, CLIENT_ID)
@@ -91,11 +127,17 @@ def get_sid() -> str:
     sid = wrapper.get_sid(token)
     return sid
 
+def _new_client(sid: str) -> Client:
+    from iolite_client.client import Client
+    return Client(sid, USERNAME, PASSWORD)
+
 def get_client(force=False) -> Client:
-    global _client
+    global _client, _discovery_done
     if force or _client is None:
-        sid = get_sid()
-        _client = Client(sid, USERNAME, PASSWORD)
+        _client = _new_client(get_sid())
+        # Un cliente nuevo no tiene discovery todavía
+        _discovery_done = False
+        _invalidate_blind_caches()
     return _client
 
 def ensure_discovery():
@@ -104,26 +146,67 @@ def ensure_discovery():
         return
     try:
         get_client().discover()
-        _discovery_done = True
     except Exception as e:
         logger.warning(f"discover() falló, reintentando con nuevo SID: {e}")
-        _client = Client(get_sid(), USERNAME, PASSWORD)
+        _discovery_done = False
+        _invalidate_blind_caches()
+        _client = _new_client(get_sid())
         get_client().discover()
-        _discovery_done = True
+    _index_blinds(get_client())
+    _discovery_done = True
+
+def _index_blinds(client: Client):
+    global _all_blind_ids_cache
+    from iolite_client.entity import Blind
+
+    _invalidate_blind_caches()
+    # dict conserva el orden de inserción: dedup en O(N)
+    all_ids: Dict[str, None] = {}
+    for room in client.discovered.get_rooms():
+        room_ids = [d.identifier for d in room.devices.values() if isinstance(d, Blind)]
+        # "Todas" incluye cada cuarto, aunque se repita el nombre
+        for i in room_ids:
+            all_ids[i] = None
+        # Igual que find_room_by_name: gana el primer cuarto con ese nombre
+        if room.name not in _blind_ids_by_room:
+            _blind_ids_by_room[room.name] = room_ids
+    for rid_list in FALLBACK_BLINDS.values():
+        for i in rid_list:
+            all_ids[i] = None
+    _all_blind_ids_cache = list(all_ids)
 
 # ================== Cuartos ==================
-ES_TO_INTERNAL = {
+# Sólo se pliegan los acentos que aparecen en nombres de cuartos en español
+# (otros, p.ej. "è", se dejan tal cual); se aplica después de lower()
+_ACCENT_TABLE = str.maketrans("áéíóúüñ", "aeiouun")
+_ARTICLES = ("la ", "el ", "los ", "las ")
+
+@lru_cache(maxsize=256)
+def _strip_articles_and_accents(text: str) -> str:
+    t = text.strip().lower()
+    if t.startswith(_ARTICLES):
+        # Todos los artículos terminan en su primer espacio
+        t = t[t.index(" ") + 1:]
+    if not t.isascii():
+        # Entrada descompuesta ("n" + U+0303): se compone para que la tabla la reconozca
+        t = unicodedata.normalize("NFC", t)
+    return t.translate(_ACCENT_TABLE)
+
+# Se escriben como se dicen; los acentos se pliegan abajo al construir ES_TO_INTERNAL
+_RAW_ES_TO_INTERNAL = {
     "sala": "WoKo",
     "pasillo": "Flur",
     "cuarto": "Schlafen",
     "dormitorio": "Schlafen",
-    "recamara": "Schlafen", "recámara": "Schlafen",
-    "bano": "Bad", "baño": "Bad",
+    "recámara": "Schlafen",
+    "baño": "Bad",
     # originales
     "woko": "WoKo", "wohnzimmer": "WoKo",
     "flur": "Flur", "hall": "Flur",
     "schlafen": "Schlafen", "bad": "Bad",
 }
+# Claves ya normalizadas: la búsqueda en normalize_room es un solo dict.get
+ES_TO_INTERNAL = {_strip_articles_and_accents(k): v for k, v in _RAW_ES_TO_INTERNAL.items()}
 INTERNAL_TO_ES = {
     "WoKo": "la sala",
     "Flur": "el pasillo",
@@ -137,47 +220,61 @@ FALLBACK_BLINDS: Dict[str, List[str]] = {
     "Bad": [],
 }
 
-def _strip_articles_and_accents(text: str) -> str:
-    t = text.strip().lower()
-    for art in ("la ", "el ", "los ", "las "):
-        if t.startswith(art):
-            t = t[len(art):]
-            break
-    t = "".join(c for c in unicodedata.normalize("NFD", t) if unicodedata.category(c) != "Mn")
-    return t.replace("ñ", "n")
+@lru_cache(maxsize=256)
+def _normalize_room_cached(spoken: str) -> Optional[str]:
+    key = _strip_articles_and_accents(spoken)
+    return ES_TO_INTERNAL.get(key)
+
+# Último (spoken, interno): en una sesión se suele repetir el mismo cuarto
+_last_room: Tuple[str, Optional[str]] = ("", None)
 
 def normalize_room(spoken: Optional[str]) -> Optional[str]:
+    global _last_room
     if not spoken: return None
-    key = _strip_articles_and_accents(spoken)
-    return ES_TO_INTERNAL.get(key)
+    lr = _last_room
+    if lr[0] == spoken:
+        return lr[1]
+    internal = _normalize_room_cached(spoken)
+    _last_room = (spoken, internal)
+    return internal
 
 def say_room_es(internal: str) -> str:
     return INTERNAL_TO_ES.get(internal, internal)
 
 def room_blind_ids(room_internal: str) -> List[str]:
     ensure_discovery()
-    client = get_client()
-    ids: List[str] = []
-    room = client.discovered.find_room_by_name(room_internal)
-    if room:
-        for dev in room.devices.values():
-            if isinstance(dev, Blind):
-                ids.append(dev.identifier)
-    return ids or FALLBACK_BLINDS.get(room_internal, [])
+    ids = _blind_ids_by_room.get(room_internal)
+    # Copia: quien la modifique no debe tocar el índice ni FALLBACK_BLINDS
+    return list(ids if ids else FALLBACK_BLINDS.get(room_internal, []))
 
 def all_blind_ids() -> List[str]:
     ensure_discovery()
+    return list(_all_blind_ids_cache or ())
+
+def set_blind_levels(ids: List[str], percent: int):
+    """
+    Manda el nivel a varias persianas por una sola conexión websocket:
+    un handshake TLS para todas en vez de uno por persiana.
+    """
     client = get_client()
-    ids: List[str] = []
-    for room in client.discovered.get_rooms():
-        for dev in room.devices.values():
-            if isinstance(dev, Blind) and dev.identifier not in ids:
-                ids.append(dev.identifier)
-    for rid_list in FALLBACK_BLINDS.values():
-        for i in rid_list:
-            if i not in ids:
-                ids.append(i)
-    return ids
+    if len(ids) == 1:
+        client.set_blind_level(ids[0], percent)
+    else:
+        # Si la conexión falla no se movió ninguna: el error sube, no se responde "Listo"
+        client.set_blind_levels(ids, percent)
+
+def _slot(slots, name: str) -> Optional[str]:
+    s = slots.get(name)
+    return s.value if s is not None else None
+
+def _slot_int(slots, name: str) -> Optional[int]:
+    v = _slot(slots, name)
+    if v is None:
+        return None
+    v = v.strip()
+    # A lo más un signo; así int() nunca lanza ValueError
+    d = v[1:] if v[:1] in ("+", "-") else v
+    return int(v) if d.isdecimal() else None
 
 def speak(handler_input, text: str, reprompt: Optional[str] = None):
     rb = handler_input.response_builder.speak(text)
@@ -187,15 +284,18 @@ def speak(handler_input, text: str, reprompt: Optional[str] = None):
         return rb.ask(reprompt).response
 
 # ================== HANDLERS ==================
+LAUNCH_MSG = "Listo. Ejemplos: pon las persianas de la sala al cincuenta por ciento, o pregunta la temperatura del cuarto."
+# La tarjeta no cambia entre invocaciones: se crea una vez por contenedor
+LAUNCH_CARD = SimpleCard("Mi Depa", LAUNCH_MSG)
+
 class LaunchRequestHandler(AbstractRequestHandler):
     def can_handle(self, handler_input: HandlerInput) -> bool:
         return is_request_type("LaunchRequest")(handler_input)
     def handle(self, handler_input: HandlerInput) -> Response:
-        msg = "Listo. Ejemplos: pon las persianas de la sala al cincuenta por ciento, o pregunta la temperatura del cuarto."
         return (handler_input.response_builder
-                .speak(msg)
+                .speak(LAUNCH_MSG)
                 .ask("¿Sala, cuarto, pasillo o baño?")
-                .set_card(SimpleCard("Mi Depa", msg))
+                .set_card(LAUNCH_CARD)
                 .response)
 
 class SetBlindLevelIntentHandler(AbstractRequestHandler):
@@ -204,14 +304,8 @@ class SetBlindLevelIntentHandler(AbstractRequestHandler):
     def handle(self, handler_input: HandlerInput) -> Response:
         intent = handler_input.request_envelope.request.intent
         slots = intent.slots or {}
-        room_spoken = slots.get("room").value if slots.get("room") else None
-        percent_raw = slots.get("percent").value if slots.get("percent") else None
-
-        room_internal = normalize_room(room_spoken)
-        try:
-            percent = int(percent_raw) if percent_raw is not None else None
-        except ValueError:
-            percent = None
+        room_internal = normalize_room(_slot(slots, "room"))
+        percent = _slot_int(slots, "percent")
 
         if not room_internal or percent is None:
             return speak(handler_input,
@@ -223,8 +317,7 @@ class SetBlindLevelIntentHandler(AbstractRequestHandler):
         if not ids:
             return speak(handler_input, f"No encontré persianas en {say_room_es(room_internal)}.")
 
-        for dev_id in ids:
-            get_client().set_blind_level(dev_id, percent)
+        set_blind_levels(ids, percent)
 
         return speak(handler_input,
             f"Listo, persianas de {say_room_es(room_internal)} al {percent} por ciento.",
@@ -236,11 +329,7 @@ class SetAllBlindsIntentHandler(AbstractRequestHandler):
     def handle(self, handler_input: HandlerInput) -> Response:
         intent = handler_input.request_envelope.request.intent
         slots = intent.slots or {}
-        percent_raw = slots.get("percent").value if slots.get("percent") else None
-        try:
-            percent = int(percent_raw) if percent_raw is not None else None
-        except ValueError:
-            percent = None
+        percent = _slot_int(slots, "percent")
 
         if percent is None:
             return speak(handler_input, "¿A qué porcentaje? Di un número entre cero y cien.")
@@ -249,8 +338,7 @@ class SetAllBlindsIntentHandler(AbstractRequestHandler):
         if not ids:
             return speak(handler_input, "No encontré persianas en tu depa.")
 
-        for dev_id in ids:
-            get_client().set_blind_level(dev_id, percent)
+        set_blind_levels(ids, percent)
 
         return speak(handler_input, f"Listo, puse todas las persianas al {percent} por ciento.",
                      reprompt="¿Algo más?")
@@ -261,8 +349,7 @@ class GetRoomTempIntentHandler(AbstractRequestHandler):
     def handle(self, handler_input: HandlerInput) -> Response:
         intent = handler_input.request_envelope.request.intent
         slots = intent.slots or {}
-        room_spoken = slots.get("room").value if slots.get("room") else None
-        room_internal = normalize_room(room_spoken)
+        room_internal = normalize_room(_slot(slots, "room"))
 
         if not room_internal:
             return speak(handler_input,
@@ -293,12 +380,29 @@ class CancelStopHandler(AbstractRequestHandler):
     def handle(self, handler_input: HandlerInput) -> Response:
         return handler_input.response_builder.speak("Hecho.").response
 
+# sb sólo llama a IntentDispatchHandler; los can_handle de cada handler se mantienen
+# (el SDK los declara abstractos) y los tests verifican que coinciden con este mapa.
+_cancel_stop = CancelStopHandler()
+_INTENT_MAP: Dict[str, AbstractRequestHandler] = {
+    "SetBlindLevelIntent": SetBlindLevelIntentHandler(),
+    "SetAllBlindsIntent": SetAllBlindsIntentHandler(),
+    "GetRoomTempIntent": GetRoomTempIntentHandler(),
+    "AMAZON.HelpIntent": HelpHandler(),
+    "AMAZON.CancelIntent": _cancel_stop,
+    "AMAZON.StopIntent": _cancel_stop,
+}
+
+class IntentDispatchHandler(AbstractRequestHandler):
+    """Despacha los IntentRequest con un dict por nombre en vez de recorrer can_handle de cada handler."""
+    def can_handle(self, handler_input: HandlerInput) -> bool:
+        return (is_request_type("IntentRequest")(handler_input) and
+                get_intent_name(handler_input) in _INTENT_MAP)
+    def handle(self, handler_input: HandlerInput) -> Optional[Response]:
+        # get_intent_name está tipado como AnyStr; en un IntentRequest siempre es str
+        return _INTENT_MAP[cast(str, get_intent_name(handler_input))].handle(handler_input)
+
 # ================== REGISTRO ==================
 sb.add_request_handler(LaunchRequestHandler())
-sb.add_request_handler(SetBlindLevelIntentHandler())
-sb.add_request_handler(SetAllBlindsIntentHandler())
-sb.add_request_handler(GetRoomTempIntentHandler())
-sb.add_request_handler(HelpHandler())
-sb.add_request_handler(CancelStopHandler())
+sb.add_request_handler(IntentDispatchHandler())
 
 lambda_handler = sb.lambda_handler()
\ No newline at end of file
@@ -1,6 +1,9 @@
 import unittest
+from unittest.mock import AsyncMock, patch
 
-from iolite_client.client import Discovered
+import pytest
+
+from iolite_client.client import Client, Discovered
 from iolite_client.entity import Heating, Room, Switch
 
 
@@ -97,5 +100,26 @@ class DiscoveredTest(unittest.TestCase):
         )
 
 
+class ClientTest(unittest.TestCase):
+    @pytest.mark.enable_socket
+    def test_set_blind_levels_sends_all_requests_at_once(self):
+        client = Client("sid", "user", "pass")
+        with patch.object(
+            client, "_fetch_application", new_callable=AsyncMock
+        ) as fetch_application:
+            client.set_blind_levels(["Blind_1", "Blind_2"], 40)
+
+        fetch_application.assert_awaited_once()
+        (requests,) = fetch_application.await_args.args
+        self.assertEqual(
+            [
+                "devices[id='Blind_1']/properties[name='blindLevel']",
+                "devices[id='Blind_2']/properties[name='blindLevel']",
+            ],
+            [request["objectQuery"] for request in requests],
+        )
+        self.assertTrue(all(r["parameters"][0]["value"] == 40 for r in requests))
+
+
 if __name__ == "__main__":
     unittest.main()
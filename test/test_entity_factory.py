@@ -2,7 +2,7 @@ import unittest
 from typing import Dict
 
 from iolite_client import entity_factory
-from iolite_client.entity import RadiatorValve
+from iolite_client.entity import Blind, InFloorValve, RadiatorValve
 from iolite_client.exceptions import UnsupportedDeviceError
 
 EXAMPLE_HEATER: Dict = {
@@ -351,6 +351,68 @@ class EntityTest(unittest.TestCase):
         self.assertEqual(0, heater.valve_position)
         self.assertEqual(19, heater.current_env_temp)
 
+    def test_create_heater_knx(self):
+        heater = entity_factory.create_device(
+            {
+                "class": "Device",
+                "id": "id-2",
+                "typeName": "Heater",
+                "friendlyName": "Fussbodenheizung",
+                "placeIdentifier": "placeIdentifier-1",
+                "properties": [
+                    {"name": "currentEnvironmentTemperature", "value": 21.5},
+                    {"name": "heatingTemperatureSetting", "value": 22.0},
+                ],
+            }
+        )
+        self.assertIsInstance(heater, InFloorValve)
+        self.assertEqual(22.0, heater.heating_temperature_setting)
+        self.assertEqual(21.5, heater.current_env_temp)
+        self.assertEqual("UNKNOWN", heater.device_status)
+
+    def test_create_blind(self):
+        blind = entity_factory.create_device(
+            {
+                "class": "Device",
+                "id": "id-3",
+                "typeName": "Blind",
+                "friendlyName": "Rollo",
+                "placeIdentifier": "placeIdentifier-1",
+                "properties": [{"name": "blindLevel", "value": 40}],
+            }
+        )
+        self.assertIsInstance(blind, Blind)
+        self.assertEqual(40, blind.blind_level)
+
+    def test_create_blind_duplicate_property_uses_first(self):
+        blind = entity_factory.create_device(
+            {
+                "class": "Device",
+                "id": "id-5",
+                "typeName": "Blind",
+                "friendlyName": "Rollo",
+                "placeIdentifier": "placeIdentifier-1",
+                "properties": [
+                    {"name": "blindLevel", "value": 40},
+                    {"name": "blindLevel", "value": 80},
+                ],
+            }
+        )
+        self.assertEqual(40, blind.blind_level)
+
+    def test_create_heater_unrecognized_properties(self):
+        with self.assertRaises(UnsupportedDeviceError):
+            entity_factory.create_device(
+                {
+                    "class": "Device",
+                    "id": "id-4",
+                    "typeName": "Heater",
+                    "friendlyName": "Heizung",
+                    "placeIdentifier": "placeIdentifier-1",
+                    "properties": [{"name": "rssi", "value": -64.0}],
+                }
+            )
+
     def test_create_device_unsupported_device(self):
         with self.assertRaises(UnsupportedDeviceError):
             entity_factory.create_device(
@@ -0,0 +1,197 @@
+import json
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from ask_sdk_core.handler_input import HandlerInput
+from ask_sdk_model import Intent, IntentRequest, LaunchRequest, RequestEnvelope
+from freezegun import freeze_time
+
+os.environ.setdefault("HTTP_USERNAME", "user")
+os.environ.setdefault("HTTP_PASSWORD", "pass")
+os.environ.setdefault("CLIENT_ID", "client")
+
+import lambda_function  # noqa: E402
+from iolite_client.client import Client  # noqa: E402
+from iolite_client.entity import Blind, Room, Switch  # noqa: E402
+
+
+def _slots(**values):
+    return {name: SimpleNamespace(value=value) for name, value in values.items()}
+
+
+class SlotIntTest(unittest.TestCase):
+    def test_parses_integers(self):
+        for raw, expected in (("50", 50), ("-5", -5), ("+5", 5), (" 5", 5)):
+            with self.subTest(raw=raw):
+                self.assertEqual(
+                    expected, lambda_function._slot_int(_slots(percent=raw), "percent")
+                )
+
+    def test_rejects_non_integers(self):
+        for raw in ("--5", "+", "", "cincuenta", "5.5", "²", None):
+            with self.subTest(raw=raw):
+                self.assertIsNone(
+                    lambda_function._slot_int(_slots(percent=raw), "percent")
+                )
+
+    def test_missing_slot(self):
+        self.assertIsNone(lambda_function._slot_int({}, "percent"))
+
+
+class IndexBlindsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        client = Client("sid", "user", "pass")
+        discovered = client.discovered
+        for identifier, blind_id in (("r1", "b_r1"), ("r2", "b_r2")):
+            room = Room(identifier, "WoKo")
+            room.add_device(Blind(blind_id, blind_id, identifier, "Generic", 0))
+            discovered.add_room(room)
+        discovered.add_device(Switch("s_r1", "Switch", "r1", "Generic"))
+        lambda_function._index_blinds(client)
+
+    def tearDown(self) -> None:
+        lambda_function._invalidate_blind_caches()
+
+    def test_room_uses_first_room_with_name(self):
+        self.assertEqual(["b_r1"], lambda_function._blind_ids_by_room["WoKo"])
+
+    def test_results_are_copies(self):
+        lambda_function._discovery_done = True
+        try:
+            lambda_function.all_blind_ids().clear()
+            lambda_function.room_blind_ids("WoKo").clear()
+            self.assertEqual(["b_r1"], lambda_function.room_blind_ids("WoKo"))
+            self.assertEqual(6, len(lambda_function.all_blind_ids()))
+        finally:
+            lambda_function._discovery_done = False
+
+    def test_all_includes_every_room_and_fallbacks(self):
+        self.assertEqual(
+            ["b_r1", "b_r2", "Blind_22", "Blind_21", "Blind_11", "Blind_41"],
+            lambda_function._all_blind_ids_cache,
+        )
+
+
+class NormalizeRoomTest(unittest.TestCase):
+    def setUp(self) -> None:
+        lambda_function._last_room = ("", None)
+        lambda_function._normalize_room_cached.cache_clear()
+
+    def test_normalize_room(self):
+        for spoken, expected in (
+            ("sala", "WoKo"),
+            ("La Sala", "WoKo"),
+            ("el pasillo", "Flur"),
+            ("La Recámara", "Schlafen"),
+            ("recamara", "Schlafen"),
+            ("BAÑO", "Bad"),
+            (" el baño ", "Bad"),
+            ("ban\u0303o", "Bad"),  # decomposed "ñ" is supported
+            ("Wohnzimmer", "WoKo"),
+            ("cocina", None),
+            ("", None),
+            (None, None),
+        ):
+            with self.subTest(spoken=spoken):
+                self.assertEqual(expected, lambda_function.normalize_room(spoken))
+
+    def test_repeated_room_skips_lookup(self):
+        self.assertEqual("WoKo", lambda_function.normalize_room("la sala"))
+        with patch.object(lambda_function, "_normalize_room_cached") as cached:
+            self.assertEqual("WoKo", lambda_function.normalize_room("la sala"))
+        cached.assert_not_called()
+
+
+class SSMOAuthStorageTest(unittest.TestCase):
+    PARAM = "/test/access_token"
+
+    def setUp(self) -> None:
+        lambda_function._token_cache.clear()
+        self.ssm = MagicMock()
+        self.ssm.get_parameter.return_value = {
+            "Parameter": {"Value": json.dumps({"access_token": "ssm"})}
+        }
+        patcher = patch.object(lambda_function, "_ssm", return_value=self.ssm)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.storage = lambda_function.SSMOAuthStorage(self.PARAM)
+
+    def tearDown(self) -> None:
+        lambda_function._token_cache.clear()
+
+    def test_hit_within_ttl_skips_ssm(self):
+        with freeze_time("2021-01-01 00:00:00") as frozen:
+            self.assertEqual({"access_token": "ssm"}, self.storage.fetch_access_token())
+            frozen.tick(lambda_function.TOKEN_CACHE_TTL - 1)
+            self.assertEqual({"access_token": "ssm"}, self.storage.fetch_access_token())
+        self.ssm.get_parameter.assert_called_once()
+
+    def test_miss_after_ttl_refetches(self):
+        with freeze_time("2021-01-01 00:00:00") as frozen:
+            self.storage.fetch_access_token()
+            self.ssm.get_parameter.return_value = {
+                "Parameter": {"Value": json.dumps({"access_token": "rotated"})}
+            }
+            frozen.tick(lambda_function.TOKEN_CACHE_TTL)
+            self.assertEqual(
+                {"access_token": "rotated"}, self.storage.fetch_access_token()
+            )
+        self.assertEqual(2, self.ssm.get_parameter.call_count)
+
+    def test_store_refreshes_cache(self):
+        with freeze_time("2021-01-01 00:00:00"):
+            self.storage.fetch_access_token()
+            self.storage.store_access_token({"access_token": "stored"})
+            self.assertEqual(
+                {"access_token": "stored"}, self.storage.fetch_access_token()
+            )
+        self.ssm.put_parameter.assert_called_once()
+        self.ssm.get_parameter.assert_called_once()
+
+    def test_returns_copies(self):
+        with freeze_time("2021-01-01 00:00:00"):
+            self.storage.fetch_access_token()["access_token"] = "mutated"
+            self.assertEqual({"access_token": "ssm"}, self.storage.fetch_access_token())
+
+
+def _handler_input(request) -> HandlerInput:
+    return HandlerInput(request_envelope=RequestEnvelope(request=request))
+
+
+def _intent_input(name: str) -> HandlerInput:
+    return _handler_input(IntentRequest(intent=Intent(name=name)))
+
+
+class IntentDispatchHandlerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dispatcher = lambda_function.IntentDispatchHandler()
+
+    def test_each_intent_reaches_its_handler(self):
+        for name, handler in lambda_function._INTENT_MAP.items():
+            with self.subTest(intent=name):
+                handler_input = _intent_input(name)
+                self.assertTrue(self.dispatcher.can_handle(handler_input))
+                with patch.object(handler, "handle", return_value="ok") as handle:
+                    self.assertEqual("ok", self.dispatcher.handle(handler_input))
+                handle.assert_called_once_with(handler_input)
+
+    def test_map_agrees_with_can_handle(self):
+        handlers = set(lambda_function._INTENT_MAP.values())
+        for name, mapped in lambda_function._INTENT_MAP.items():
+            for handler in handlers:
+                with self.subTest(intent=name, handler=type(handler).__name__):
+                    self.assertEqual(
+                        handler is mapped, handler.can_handle(_intent_input(name))
+                    )
+
+    def test_unknown_intent_is_not_handled(self):
+        self.assertFalse(self.dispatcher.can_handle(_intent_input("DeathStarIntent")))
+
+    def test_non_intent_request_is_not_handled(self):
+        self.assertFalse(self.dispatcher.can_handle(_handler_input(LaunchRequest())))
+
+
+if __name__ == "__main__":
+    unittest.main()